@@ -0,0 +1,336 @@
+"""
+Copyright (C) 2021  Robert Lieback <info@zetabyte.de>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import sys
+import ctypes
+import functools
+import threading
+from ctypes import wintypes
+from PySide2.QtCore import Qt, QThread, QThreadPool, QRunnable, QObject, QTimer, Signal
+from PySide2.QtWidgets import QSystemTrayIcon, QMenu, QMainWindow, QWidget, QHBoxLayout, QLineEdit, QPushButton, QMessageBox
+from PySide2.QtGui import QCursor
+import win32gui, win32con, win32api
+
+import qtawesome as qta
+from requests import RequestException
+from snom import Snom
+
+MOD_NOREPEAT = 0x4000  # missing in pywin32's win32con, fire once per press instead of per auto-repeat
+
+# RegisterHotKey can't tell left and right modifiers apart, alt_gr is ctrl+alt on windows
+_HOTKEY_MODIFIERS = {
+    "<ctrl>": win32con.MOD_CONTROL,
+    "<ctrl_l>": win32con.MOD_CONTROL,
+    "<ctrl_r>": win32con.MOD_CONTROL,
+    "<alt>": win32con.MOD_ALT,
+    "<alt_l>": win32con.MOD_ALT,
+    "<alt_r>": win32con.MOD_ALT,
+    "<alt_gr>": win32con.MOD_CONTROL | win32con.MOD_ALT,
+    "<shift>": win32con.MOD_SHIFT,
+    "<shift_l>": win32con.MOD_SHIFT,
+    "<shift_r>": win32con.MOD_SHIFT,
+    "<cmd>": win32con.MOD_WIN,
+    "<cmd_l>": win32con.MOD_WIN,
+    "<cmd_r>": win32con.MOD_WIN,
+}
+
+# modifier bits in the high byte of VkKeyScan's result
+_VKKEYSCAN_MODIFIERS = {
+    1: win32con.MOD_SHIFT,
+    2: win32con.MOD_CONTROL,
+    4: win32con.MOD_ALT,
+}
+
+# pynput's special key names
+_HOTKEY_KEYS = {
+    "<space>": win32con.VK_SPACE,
+    "<enter>": win32con.VK_RETURN,
+    "<tab>": win32con.VK_TAB,
+    "<esc>": win32con.VK_ESCAPE,
+    "<backspace>": win32con.VK_BACK,
+    "<delete>": win32con.VK_DELETE,
+    "<insert>": win32con.VK_INSERT,
+    "<home>": win32con.VK_HOME,
+    "<end>": win32con.VK_END,
+    "<page_up>": win32con.VK_PRIOR,
+    "<page_down>": win32con.VK_NEXT,
+    "<up>": win32con.VK_UP,
+    "<down>": win32con.VK_DOWN,
+    "<left>": win32con.VK_LEFT,
+    "<right>": win32con.VK_RIGHT,
+    "<pause>": win32con.VK_PAUSE,
+    "<caps_lock>": win32con.VK_CAPITAL,
+    "<num_lock>": win32con.VK_NUMLOCK,
+    "<scroll_lock>": win32con.VK_SCROLL,
+    "<print_screen>": win32con.VK_SNAPSHOT,
+    "<menu>": win32con.VK_APPS,
+    "<media_play_pause>": 0xB3,
+    "<media_next>": 0xB0,
+    "<media_previous>": 0xB1,
+    "<media_volume_mute>": 0xAD,
+    "<media_volume_down>": 0xAE,
+    "<media_volume_up>": 0xAF,
+    **{f"<f{n}>": win32con.VK_F1 + n - 1 for n in range(1, 25)},
+}
+
+
+@functools.lru_cache(maxsize=None)
+def phone_icon(color):
+    # needs a running QApplication
+    return qta.icon("fa.phone-square", options=[{'color': color, 'scale_factor': 1.3}])
+
+
+def parse_hotkey(hotkey):
+    # "<ctrl>+<alt>+s" -> (MOD_CONTROL | MOD_ALT, virtual key code of s), as RegisterHotKey wants it
+    modifiers = 0
+    vk = None
+    for token in hotkey.lower().split("+"):
+        if token in _HOTKEY_MODIFIERS:
+            modifiers |= _HOTKEY_MODIFIERS[token]
+        elif vk is None and token in _HOTKEY_KEYS:
+            vk = _HOTKEY_KEYS[token]
+        elif vk is None and token.startswith("<") and token.endswith(">") and token[1:-1].isdigit():
+            vk = int(token[1:-1])  # raw virtual key code, like <65>
+        elif vk is None and len(token) == 1 and win32api.VkKeyScan(token) & 0xffff != 0xffff:
+            # characters like ? need shift on most layouts, the high byte says which modifiers
+            scan = win32api.VkKeyScan(token)
+            vk = scan & 0xff
+            for bit, modifier in _VKKEYSCAN_MODIFIERS.items():
+                if scan >> 8 & bit:
+                    modifiers |= modifier
+        else:
+            raise ValueError(f"Can't parse hotkey {hotkey}")
+    if vk is None:
+        raise ValueError(f"Hotkey {hotkey} has no key, only modifiers")
+    return modifiers, vk
+
+
+class DialWindow(QMainWindow):
+    def __init__(self, configuration):
+        super().__init__()
+        self.config = configuration
+
+        self.snom = Snom(ip=self.config['ip'], username=self.config['username'], password=self.config['password'])
+        self.warmup_thread = WarmupThread(self.snom)
+        self.warmup_thread.start()
+
+        # one worker keeps the commands in the order they were given, e.g. dial before hangup
+        self.request_pool = QThreadPool(self)
+        self.request_pool.setMaxThreadCount(1)
+
+        self.window_title = "Snom Dialer"
+        self.setWindowTitle(self.window_title)
+        self.setFixedSize(400, 50)
+        self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
+        self.shift_pressed = False
+        self.dial_guard = False
+
+        self.number_input = QLineEdit()
+        self.number_input.returnPressed.connect(self.dial)
+
+        self.dial_button = QPushButton(phone_icon("green"), "")
+        self.dial_button.clicked.connect(self.dial)
+
+        self.hangup_button = QPushButton(phone_icon("red"), "")
+        self.hangup_button.clicked.connect(self.hangup)
+
+        layout = QHBoxLayout()
+        layout.addWidget(self.number_input)
+        layout.addWidget(self.dial_button)
+        layout.addWidget(self.hangup_button)
+        widget = QWidget()
+        widget.setLayout(layout)
+        self.setCentralWidget(widget)
+
+        self.hotkey_thread = HotKeys(self.config)
+        self.hotkey_thread.hotkey_show_main_window.connect(self.show)
+        self.hotkey_thread.hotkey_hangup.connect(self.hangup)
+        self.hotkey_thread.hotkey_failed.connect(self.hotkey_failed)
+        self.hotkey_thread.start()
+
+    def keyPressEvent(self, event) -> None:
+        if event.key() == Qt.Key_Escape:
+            self.hide()
+            return
+        if event.key() == Qt.Key_Shift:
+            self.shift_pressed = True
+        else:
+            super().keyPressEvent(event)
+
+    def keyReleaseEvent(self, event) -> None:
+        if event.key() == Qt.Key_Shift:
+            self.shift_pressed = False
+
+    def dial(self):
+        # returnPressed and a click can fire right after each other, don't dial twice
+        if self.dial_guard:
+            return
+        self.dial_guard = True
+        QTimer.singleShot(150, self.release_dial_guard)
+
+        text = self.number_input.text()
+        if self.shift_pressed:
+            if ";" in text:  # send raw keyevent
+                self.send(functools.partial(self.snom.key_events, text))
+            else:
+                self.send(functools.partial(self.snom.key_events, ";".join(text)))
+        else:
+            self.send(functools.partial(self.snom.dial, text))
+
+    def release_dial_guard(self):
+        self.dial_guard = False
+
+    def hangup(self):
+        self.send(self.snom.hangup_all)
+
+    def send(self, command):
+        # talk to the phone from the thread pool, so a slow or unreachable phone doesn't freeze the ui
+        task = DialTask(command)
+        task.request_failed.sig.connect(self.request_failed)
+        self.request_pool.start(task)
+
+    def request_failed(self, message):
+        QMessageBox.warning(self, self.window_title, f"Couldn't reach the phone:\n{message}")
+
+    def hotkey_failed(self, message):
+        QMessageBox.warning(self, self.window_title, message)
+
+    def show(self):
+        super().show()
+
+        # minimize and restore to force the window into the foreground, qt already knows our hwnd
+        hwnd = int(self.winId())
+        win32gui.ShowWindow(hwnd, win32con.SW_MINIMIZE)
+        win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+
+        self.number_input.setFocus()
+        self.number_input.selectAll()
+
+
+class TrayIcon(QSystemTrayIcon):
+
+    def __init__(self, icon, dialwindow):
+        super().__init__(icon)
+        self.activated.connect(self.showMenuOnTrigger)
+
+        self.mainwindow = dialwindow
+
+        self.menu = QMenu()
+        self.menu.addAction("Dial", self.mainwindow.show)
+        self.menu.addSeparator()
+        self.menu.addAction("Quit", self.exit)
+        self.setContextMenu(self.menu)
+
+    def showMenuOnTrigger(self, reason):
+        if reason == QSystemTrayIcon.Trigger:
+            self.contextMenu().popup(QCursor.pos())
+
+    def exit(self):
+        self.mainwindow.hotkey_thread.stop()
+        self.mainwindow.warmup_thread.wait()  # at most its 2 s timeout, qt aborts on destroying a running thread
+        # drop queued commands and let a running one finish, every request has its own timeout
+        self.mainwindow.request_pool.clear()
+        self.mainwindow.request_pool.waitForDone()
+        self.mainwindow.snom.close()
+        sys.exit()
+
+
+class RequestFailedSignal(QObject):
+    sig = Signal(str)
+
+
+class DialTask(QRunnable):
+    def __init__(self, command):
+        super().__init__()
+        self.command = command
+        self.request_failed = RequestFailedSignal()
+
+    def run(self):
+        try:
+            self.command()
+        except RequestException as e:
+            self.request_failed.sig.emit(str(e))
+
+
+class WarmupThread(QThread):
+    def __init__(self, snom, parent=None):
+        QThread.__init__(self, parent)
+        self.snom = snom
+
+    def run(self):
+        self.snom.warmup()
+
+
+class HotKeys(QThread):
+    SHOW_WINDOW = 1
+    HANGUP = 2
+
+    hotkey_show_main_window = Signal()
+    hotkey_hangup = Signal()
+    hotkey_failed = Signal(str)
+
+    def __init__(self, configuration, parent=None):
+        QThread.__init__(self, parent)
+        self.hotkeys = {
+            self.SHOW_WINDOW: configuration["hotkey_show_window"],
+            self.HANGUP: configuration["hotkey_hangup"],
+        }
+        self.thread_id = None
+        self.queue_ready = threading.Event()
+
+    def run(self):
+        # RegisterHotKey posts WM_HOTKEY to this thread's message queue only when a chord fires,
+        # instead of hooking every keystroke system wide
+        self.thread_id = win32api.GetCurrentThreadId()
+        user32 = ctypes.windll.user32
+        msg = wintypes.MSG()
+        # peeking creates the message queue, so stop() can't post WM_QUIT before it exists
+        user32.PeekMessageW(ctypes.byref(msg), None, win32con.WM_USER, win32con.WM_USER, win32con.PM_NOREMOVE)
+        self.queue_ready.set()
+
+        for hotkey_id, hotkey in self.hotkeys.items():
+            try:
+                modifiers, vk = parse_hotkey(hotkey)
+            except ValueError as e:
+                self.hotkey_failed.emit(f"{e}, please fix it in config.json.")
+                continue
+            if not user32.RegisterHotKey(None, hotkey_id, modifiers | MOD_NOREPEAT, vk):
+                self.hotkey_failed.emit(f"Couldn't register the hotkey {hotkey}, "
+                                        f"it's probably already used by another application.")
+
+        try:
+            while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:  # 0 is WM_QUIT, -1 an error
+                if msg.message == win32con.WM_HOTKEY:
+                    if msg.wParam == self.SHOW_WINDOW:
+                        self.show_mainwindow()
+                    elif msg.wParam == self.HANGUP:
+                        self.hangup()
+        finally:
+            for hotkey_id in self.hotkeys:
+                user32.UnregisterHotKey(None, hotkey_id)
+
+    def stop(self):
+        if self.isRunning():
+            self.queue_ready.wait()
+            win32api.PostThreadMessage(self.thread_id, win32con.WM_QUIT, 0, 0)
+        self.wait()
+
+    def show_mainwindow(self):
+        self.hotkey_show_main_window.emit()
+
+    def hangup(self):
+        self.hotkey_hangup.emit()
@@ -7,7 +7,7 @@ a = Analysis(['snom-dialer.py'],
              pathex=[],
              binaries=[],
              datas=[],
-             hiddenimports=["pynput", "pynput.keyboard._win32", "pynput.mouse._win32", "pynput._util.win32"],
+             hiddenimports=[],
              hookspath=[],
              runtime_hooks=[],
              excludes=[],
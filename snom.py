@@ -1,7 +1,18 @@
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPDigestAuth
 requests.packages.urllib3.disable_warnings()
 
+# only user supplied numbers and key events can contain these
+_SNOM_TRANS = str.maketrans({'#': '%23', '*': '%2A'})
+
+
+def _escape(value):
+    # most numbers contain neither, so don't translate into a new string for nothing
+    if '#' in value or '*' in value:
+        return value.translate(_SNOM_TRANS)
+    return value
+
 
 class Snom:
     def __init__(self, ip, username, password):
@@ -9,22 +20,42 @@ class Snom:
         self.username = username
         self.password = password
         self.cmd_url = f"https://{self.ip}/command.htm?"
+        self._cmd_key_prefix = f"{self.cmd_url}key="
+        self._cmd_number_prefix = f"{self.cmd_url}number="
+
+        # one keep-alive connection to the phone instead of a new TLS handshake per command
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0))
+        self.session.auth = HTTPDigestAuth(self.username, self.password)
+        self.session.verify = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def warmup(self):
+        # best effort: open the tcp/tls connection before the first real command, so dialing can reuse it
+        try:
+            self.session.get(f"https://{self.ip}/", timeout=2)
+        except requests.RequestException:
+            pass
 
     def key_events(self, events: str):
-        self.send_request(f"{self.cmd_url}key={events}")
+        self.send_request(self._cmd_key_prefix + _escape(events))
 
     def dial(self, number: str):
-        self.send_request(f"{self.cmd_url}number={number}")
+        self.send_request(self._cmd_number_prefix + _escape(number))
 
     def hangup(self):
-        self.send_request(f"{self.cmd_url}key=CANCEL")
+        self.send_request(f"{self._cmd_key_prefix}CANCEL")
 
     def hangup_all(self):
         self.send_request(f"{self.cmd_url}RELEASE_ALL_CALLS")
 
-    def send_request(self, url):
-        requests.post(
-            url.replace('#', '%23').replace('*', '%2A'),
-            auth=HTTPDigestAuth(self.username, self.password),
-            verify=False
-        )
+    def send_request(self, url, timeout=(2, 3)):  # (connect, read), an unreachable phone fails after 2 s
+        self.session.post(url, timeout=timeout)